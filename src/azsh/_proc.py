@@ -0,0 +1,79 @@
+"""Shared subprocess helpers: run a command with a timeout, shut it down cleanly, parse its JSON."""
+
+import asyncio
+import json
+from typing import Optional
+
+# How long a timed-out process gets to exit after SIGTERM before it is killed
+TERMINATE_GRACE = 2.0
+# JSON output larger than this is parsed in a worker thread; below it the thread hop
+# costs more than the parse
+LARGE_JSON_BYTES = 64 * 1024
+
+
+def kill_process(process: asyncio.subprocess.Process) -> None:
+    """Kill a process without waiting; the event loop's child watcher reaps it."""
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def stop_process(process: asyncio.subprocess.Process) -> None:
+    """Terminate a process, killing it if it ignores SIGTERM, and reap it."""
+    if process.returncode is not None:
+        return
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), timeout=TERMINATE_GRACE)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        kill_process(process)
+        # The child watcher reaps the process either way; the bound only matters when
+        # a grandchild still holds the pipes open, which would block wait() until it exits
+        try:
+            await asyncio.wait_for(process.wait(), timeout=TERMINATE_GRACE)
+        except asyncio.TimeoutError:
+            pass
+    except BaseException:
+        # Cancelled during the grace period: don't leave it running
+        kill_process(process)
+        raise
+
+
+async def exec_capture(
+    argv: list[str], timeout: float, cwd: Optional[str] = None
+) -> tuple[int, bytes, bytes]:
+    """Run `argv` (no shell) and return (returncode, stdout, stderr).
+
+    Raises asyncio.TimeoutError after stopping the process if it runs longer than
+    `timeout` seconds, and OSError if the executable cannot be started. If the
+    caller is cancelled the process is killed before the cancellation propagates.
+    """
+    # stdin is not passed through: background az calls must never consume the keys
+    # the user is typing (early_input holds the tty while they run)
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        await stop_process(process)
+        raise
+    except BaseException:
+        kill_process(process)
+        raise
+    return process.returncode, stdout, stderr
+
+
+async def parse_json(data: bytes):
+    """Parse JSON command output, off the event loop if it is large."""
+    if len(data) > LARGE_JSON_BYTES:
+        return await asyncio.to_thread(json.loads, data)
+    return json.loads(data)
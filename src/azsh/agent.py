@@ -1,6 +1,8 @@
 """GitHub Copilot SDK client setup and session management for azsh."""
 
 import os
+import re
+from typing import Callable, Optional
 
 from copilot import CopilotClient
 from rich.console import Console
@@ -22,6 +24,9 @@ DESTRUCTIVE_KEYWORDS = [
     "rm -rf",
 ]
 
+# All keywords as one case-insensitive alternation, so a command is scanned once
+_DESTRUCTIVE_RE = re.compile("|".join(map(re.escape, DESTRUCTIVE_KEYWORDS)), re.IGNORECASE)
+
 
 def detect_cloud_shell() -> bool:
     """Returns True if running inside Azure Cloud Shell."""
@@ -39,7 +44,7 @@ async def on_pre_tool_use(input, invocation) -> dict:
     if tool_name == "run_command":
         command = str(input.get("toolArgs", {}).get("command", input.get("input", {}).get("command", "")))
         console.print(f"[yellow]🔧 Running:[/yellow] [dim]{command}[/dim]")
-        if any(kw in command.lower() for kw in DESTRUCTIVE_KEYWORDS):
+        if _DESTRUCTIVE_RE.search(command):
             return {"permissionDecision": "ask"}
     else:
         console.print(f"[yellow]🔧 {tool_name}[/yellow]")
@@ -70,9 +75,13 @@ async def handle_user_input(request, invocation) -> dict:
     return {"answer": answer, "wasFreeform": True}
 
 
-async def create_agent():
+async def create_agent(before_user_input: Optional[Callable[[], None]] = None):
     """Create and start a Copilot client and session.
 
+    Args:
+        before_user_input: Called before the agent prompts the user for input, so
+            the caller can release the terminal (e.g. stop a Live display).
+
     Returns:
         tuple[CopilotClient, Session]: The client and configured session.
     """
@@ -82,6 +91,11 @@ async def create_agent():
     is_cloud_shell = detect_cloud_shell()
     system_prompt = get_system_prompt()
 
+    async def on_user_input_request(request, invocation) -> dict:
+        if before_user_input is not None:
+            before_user_input()
+        return await handle_user_input(request, invocation)
+
     session = await client.create_session(
         {
             "model": "gpt-4.1",
@@ -92,7 +106,7 @@ async def create_agent():
                 "on_pre_tool_use": on_pre_tool_use,
                 "on_post_tool_use": on_post_tool_use,
             },
-            "on_user_input_request": handle_user_input,
+            "on_user_input_request": on_user_input_request,
         }
     )
 
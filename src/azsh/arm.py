@@ -0,0 +1,205 @@
+"""Direct Azure Resource Manager (ARM) REST reads, skipping az CLI startup on hot paths."""
+
+import asyncio
+import functools
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import Optional
+
+from azsh._proc import exec_capture, parse_json
+
+# Public-cloud ARM host, used only if `az cloud show` does not report one
+ARM_HOST = "management.azure.com"
+ARM_TIMEOUT = 10
+# Refresh the cached token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# (access_token, expires_at, subscription_id, arm_host) for the active az cloud
+_token: Optional[tuple[str, float, str, str]] = None
+_token_task: Optional[asyncio.Task] = None
+# Bumped by clear_token_cache so a fetch started before a /sub cannot repopulate the cache
+_token_generation = 0
+# One keep-alive HTTPS connection per worker thread, reused across requests
+_local = threading.local()
+# (mtime_ns, default subscription id) of the last azureProfile.json read
+_profile: Optional[tuple[int, str]] = None
+
+
+def default_subscription() -> str:
+    """Return az's current default subscription id, or "" if it cannot be read.
+
+    Read from azureProfile.json, which `az account set` rewrites however it is run,
+    so this always matches what the next az command will use. The file is only
+    re-parsed when its mtime changes.
+    """
+    global _profile
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or os.path.expanduser("~/.azure")
+    path = os.path.join(config_dir, "azureProfile.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        if _profile and _profile[0] == mtime:
+            return _profile[1]
+        with open(path, "rb") as f:
+            # az writes this file with a UTF-8 BOM
+            data = json.loads(f.read().decode("utf-8-sig"))
+    except (OSError, ValueError):
+        return ""
+    sub_id = next(
+        (s.get("id", "") for s in data.get("subscriptions", []) if s.get("isDefault")), ""
+    )
+    _profile = (mtime, sub_id)
+    return sub_id
+
+
+async def _az_json(cmd: list[str]):
+    """Run an az command and return its parsed JSON output, raising RuntimeError on failure."""
+    try:
+        returncode, stdout, stderr = await exec_capture(cmd, timeout=ARM_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"timed out after {ARM_TIMEOUT}s running: {' '.join(cmd)}")
+    if returncode != 0:
+        raise RuntimeError(stderr.decode().strip() or f"az command failed: {' '.join(cmd)}")
+    return await parse_json(stdout)
+
+
+async def _fetch_token() -> tuple[str, float, str, str]:
+    """Get an ARM access token, its subscription and the ARM host of the active az cloud."""
+    # Without --resource the token is for the active cloud's ARM endpoint, which
+    # `az cloud show` reports, so sovereign clouds work too
+    data, endpoint = await asyncio.gather(
+        _az_json(["az", "account", "get-access-token", "--output", "json"]),
+        _az_json(["az", "cloud", "show", "--query", "endpoints.resourceManager", "--output", "json"]),
+    )
+    host = urllib.parse.urlsplit(endpoint or "").netloc or ARM_HOST
+    # expires_on (epoch seconds) is only present in newer az versions
+    expires_on = data.get("expires_on")
+    expires_at = float(expires_on) if expires_on else time.time() + 2 * TOKEN_REFRESH_MARGIN
+    return data["accessToken"], expires_at, data.get("subscription", ""), host
+
+
+async def _get_token() -> tuple[str, float, str, str]:
+    """Return a cached token, fetching a fresh one when it is close to expiry or
+    az's default subscription has changed since it was issued."""
+    global _token, _token_task
+    while True:
+        if _token:
+            # A stat() per call; the profile is only re-read when az has rewritten it
+            profile_sub = default_subscription()
+            if profile_sub and profile_sub.lower() != _token[2].lower():
+                # Switched outside /sub (e.g. `az account set` via run_command)
+                clear_token_cache()
+            elif time.time() < _token[1] - TOKEN_REFRESH_MARGIN:
+                return _token
+        # Share one in-flight fetch between concurrent callers
+        if _token_task is None or _token_task.done():
+            _token_task = asyncio.ensure_future(_fetch_token())
+        generation = _token_generation
+        token = await _token_task
+        if generation == _token_generation:
+            _token = token
+            return token
+        # The cache was cleared while fetching, so the token may be for the old
+        # subscription; go round again with a fresh fetch
+
+
+async def warm_up() -> None:
+    """Pre-fetch the ARM token (and cloud endpoint) in the background.
+
+    The first @mention then finds them cached instead of waiting on
+    `az account get-access-token`. Failures are left for the real call.
+    """
+    try:
+        await _get_token()
+    except Exception:
+        pass
+
+
+def clear_token_cache() -> None:
+    """Forget the cached token, e.g. after switching subscriptions."""
+    global _token, _token_task, _token_generation
+    _token = None
+    # Leave an in-flight fetch running for whoever awaits it, but never reuse it
+    _token_task = None
+    _token_generation += 1
+
+
+async def subscription_id() -> str:
+    """Return the subscription the cached ARM token was issued for."""
+    return (await _get_token())[2]
+
+
+@functools.lru_cache(maxsize=None)
+def _behind_proxy(host: str) -> bool:
+    """Whether HTTPS requests to `host` should go through a configured proxy."""
+    import urllib.request
+
+    return "https" in urllib.request.getproxies() and not urllib.request.proxy_bypass(host)
+
+
+def _connection(host: str) -> http.client.HTTPSConnection:
+    conn = getattr(_local, "conn", None)
+    if conn is None or conn.host != host:
+        if conn is not None:
+            conn.close()
+        conn = http.client.HTTPSConnection(host, timeout=ARM_TIMEOUT)
+        _local.conn = conn
+    return conn
+
+
+def _request(host: str, path: str, token: str) -> dict:
+    """GET an ARM path (with query string) and return the decoded JSON body."""
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    conn = _connection(host)
+    for attempt in (1, 2):
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive connection: close it and retry once on a fresh one
+            conn.close()
+            if attempt == 2:
+                raise
+    if response.status >= 400:
+        try:
+            message = json.loads(body).get("error", {}).get("message", "")
+        except (ValueError, AttributeError):
+            message = ""
+        raise RuntimeError(message or f"ARM request failed: HTTP {response.status} for {path}")
+    return json.loads(body)
+
+
+async def _get(path: str) -> dict:
+    """GET an ARM path (with query string), directly or via `az rest` behind a proxy."""
+    token, _, _, host = await _get_token()
+    if _behind_proxy(host):
+        # az already handles proxy settings (CONNECT, auth, custom CAs); defer to it
+        url = f"https://{host}{path}"
+        return await _az_json(["az", "rest", "--method", "get", "--url", url, "--output", "json"])
+    return await asyncio.to_thread(_request, host, path, token)
+
+
+async def arm_get(path: str, api_version: str) -> dict:
+    """GET an ARM resource path such as /subscriptions/<id>/resourceGroups/<name>."""
+    return await _get(f"{path}?api-version={api_version}")
+
+
+async def arm_list(path: str, api_version: str) -> list[dict]:
+    """GET an ARM collection path and return every item, following nextLink pages."""
+    items: list[dict] = []
+    next_path: Optional[str] = f"{path}?api-version={api_version}"
+    while next_path:
+        page = await _get(next_path)
+        items.extend(page.get("value", []))
+        next_link = page.get("nextLink")
+        if next_link:
+            parts = urllib.parse.urlsplit(next_link)
+            next_path = f"{parts.path}?{parts.query}"
+        else:
+            next_path = None
+    return items
@@ -1,16 +1,20 @@
-"""Slash commands — client-side commands that execute instantly without going through the LLM."""
+"""Slash commands — client-side commands that execute instantly without going through the LLM.
+
+rich.table and rich.panel are imported inside the handlers that draw them, keeping them
+off the startup import path.
+"""
 
 import asyncio
 import subprocess
 import json
 import os
-import shutil
+import shlex
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
 
+from azsh.arm import clear_token_cache
+from azsh.mentions import clear_account_cache, get_account
 from azsh.resource_cache import get_active_rg, get_cached_resources, set_active_rg
-from rich.markdown import Markdown
+from azsh.tools import invalidate_azure_context_cache
 
 console = Console()
 
@@ -28,6 +32,7 @@ async def handle_command(command: str) -> str | None:
     handlers = {
         "/sub": _handle_sub,
         "/rg": _handle_rg,
+        "/env": _handle_env,
         "/help": _handle_help,
         "/clear": _handle_clear,
         "/exit": _handle_exit,
@@ -46,8 +51,7 @@ def _run_az(args: str) -> dict | None:
     """Run an az CLI command with JSON output, return parsed JSON or None on failure."""
     try:
         result = subprocess.run(
-            f"az {args} --output json",
-            shell=True,
+            ["az", *shlex.split(args), "--output", "json"],
             capture_output=True,
             text=True,
             timeout=30,
@@ -55,22 +59,51 @@ def _run_az(args: str) -> dict | None:
         if result.returncode != 0:
             return None
         return json.loads(result.stdout)
-    except (subprocess.TimeoutExpired, json.JSONDecodeError):
+    except (OSError, subprocess.TimeoutExpired, json.JSONDecodeError):
         return None
 
 
+def _executables_on_path(wanted: list[str]) -> set[str]:
+    """Return which of `wanted` are executables on $PATH, scanning each directory once."""
+    names = set(wanted)
+    executables: set[str] = set()
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    # Filter by name first; only the few candidates pay for stat/access
+                    if (
+                        entry.name in names
+                        and entry.name not in executables
+                        and entry.is_file()
+                        and os.access(entry.path, os.X_OK)
+                    ):
+                        executables.add(entry.name)
+        except OSError:
+            continue
+    return executables
+
+
 async def _handle_sub(arg: str | None) -> str:
     """List subscriptions or switch to a named subscription."""
+    from rich.table import Table
+
     if arg:
-        result = await asyncio.to_thread(
-            subprocess.run,
-            f"az account set --subscription {arg!r}",
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
+        try:
+            result = await asyncio.to_thread(
+                subprocess.run,
+                ["az", "account", "set", "--subscription", arg],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            console.print(f"[red]✗ Failed to switch subscription:[/red] {e}")
+            return "handled"
         if result.returncode == 0:
+            clear_account_cache()
+            clear_token_cache()
+            invalidate_azure_context_cache()
             console.print(f"[green]✓ Switched to subscription:[/green] {arg}")
         else:
             console.print(f"[red]✗ Failed to switch subscription:[/red] {result.stderr.strip()}")
@@ -100,6 +133,8 @@ async def _handle_sub(arg: str | None) -> str:
 
 async def _handle_rg(arg: str | None) -> str:
     """List resource groups or set the active one."""
+    from rich.table import Table
+
     if arg:
         await set_active_rg(arg)
         console.print(f"[green]✓ Active resource group:[/green] [cyan]{arg}[/cyan]")
@@ -145,10 +180,23 @@ async def _handle_rg(arg: str | None) -> str:
 
 async def _handle_env(_arg: str | None) -> str:
     """Show current environment information."""
+    from rich.panel import Panel
+
     is_cloud_shell = bool(os.environ.get("CLOUD_SHELL_ID") or os.environ.get("ACC_CLOUD"))
     env_type = "Azure Cloud Shell" if is_cloud_shell else "Local Terminal"
 
-    account = await asyncio.to_thread(_run_az, "account show")
+    tools_to_check = ["az", "kubectl", "helm", "terraform", "git", "gh", "python3", "azcopy", "bicep"]
+
+    # az startup takes seconds, so scan PATH for tools while it runs
+    account, executables = await asyncio.gather(
+        get_account(),
+        asyncio.to_thread(_executables_on_path, tools_to_check),
+        return_exceptions=True,
+    )
+    if isinstance(account, Exception):
+        account = None
+    available_tools = [t for t in tools_to_check if t in executables]
+
     user = "unknown"
     subscription = "unknown"
     if account:
@@ -156,8 +204,6 @@ async def _handle_env(_arg: str | None) -> str:
         user = user_info.get("name", "unknown")
         subscription = account.get("name", "unknown")
 
-    tools_to_check = ["az", "kubectl", "helm", "terraform", "git", "gh", "python3", "azcopy", "bicep"]
-    available_tools = [t for t in tools_to_check if shutil.which(t)]
     tools_str = ", ".join(f"[green]{t}[/green]" for t in available_tools) if available_tools else "[dim]none[/dim]"
 
     content = (
@@ -172,11 +218,15 @@ async def _handle_env(_arg: str | None) -> str:
 
 async def _handle_help(_arg: str | None) -> str:
     """Show help with available slash commands and @ mentions."""
+    from rich.panel import Panel
+    from rich.table import Table
+
     cmd_table = Table(title="Slash Commands", show_header=True)
     cmd_table.add_column("Command", style="cyan")
     cmd_table.add_column("Description")
     cmd_table.add_row("/sub [name]", "List subscriptions or switch to one")
     cmd_table.add_row("/rg [name]", "List resource groups or set your working RG")
+    cmd_table.add_row("/env", "Show current environment and available tools")
     cmd_table.add_row("/help", "Show this help message")
     cmd_table.add_row("/clear", "Clear the screen")
     cmd_table.add_row("/exit", "Exit the shell")
@@ -0,0 +1,84 @@
+"""prompt_toolkit autocompletion for slash commands and @ mentions."""
+
+import asyncio
+from bisect import bisect_left
+
+from prompt_toolkit.completion import Completer, Completion
+
+from azsh.resource_cache import get_active_rg, get_resource_completions
+
+# How far back from the cursor to look for an '@'; longer than any prefix + resource name
+MENTION_SCAN_LIMIT = 128
+# Typing pause before completing; a keystroke during the pause restarts it
+COMPLETION_DEBOUNCE = 0.05
+
+SLASH_COMMANDS = {
+    "/sub": "Show/switch Azure subscription",
+    "/rg": "Set working resource group",
+    "/env": "Show current environment",
+    "/help": "Show available commands and @ mentions",
+    "/clear": "Clear the screen",
+    "/exit": "Exit azsh",
+    "/quit": "Exit azsh",
+}
+
+STATIC_MENTIONS = {
+    "@sub": "Current subscription context",
+    "@file:": "File contents — @file:<path>",
+}
+
+# (key, description) pairs sorted once so completion can bisect to the matching prefix range
+_SLASH_ENTRIES = sorted(SLASH_COMMANDS.items())
+_STATIC_MENTION_ENTRIES = sorted(STATIC_MENTIONS.items())
+
+
+def _entries_with_prefix(entries: list[tuple[str, str]], prefix: str):
+    """Yield the (key, description) pairs of sorted `entries` whose key starts with `prefix`."""
+    # (prefix,) sorts before every (key, description) pair with key >= prefix
+    i = bisect_left(entries, (prefix,))
+    while i < len(entries) and entries[i][0].startswith(prefix):
+        yield entries[i]
+        i += 1
+
+
+class AzshCompleter(Completer):
+    """Autocomplete for slash commands and @ mentions."""
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+
+        if text.startswith("/"):
+            for cmd, desc in _entries_with_prefix(_SLASH_ENTRIES, text):
+                yield Completion(cmd, start_position=-len(text), display_meta=desc)
+
+        # Complete @ mentions at any position; only the tail of a long line can hold one
+        tail = text[-MENTION_SCAN_LIMIT:]
+        at_pos = tail.rfind("@")
+        if at_pos >= 0:
+            at_text = tail[at_pos:]
+
+            # Static mentions
+            for mention, desc in _entries_with_prefix(_STATIC_MENTION_ENTRIES, at_text):
+                yield Completion(
+                    mention,
+                    start_position=-len(at_text),
+                    display_meta=desc,
+                )
+
+            # Dynamic resources from active RG
+            rg = get_active_rg()
+            if rg:
+                for mention, desc in _entries_with_prefix(get_resource_completions(), at_text):
+                    yield Completion(
+                        mention,
+                        start_position=-len(at_text),
+                        display_meta=desc,
+                    )
+
+    async def get_completions_async(self, document, complete_event):
+        # prompt_toolkit runs one completion at a time and retries with the latest
+        # text, so waiting here collapses a burst of keystrokes into one lookup.
+        if not complete_event.completion_requested:
+            await asyncio.sleep(COMPLETION_DEBOUNCE)
+        for completion in self.get_completions(document, complete_event):
+            yield completion
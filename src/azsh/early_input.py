@@ -0,0 +1,109 @@
+"""Capture keystrokes typed while azsh is starting up so they reach the first prompt."""
+
+import asyncio
+import atexit
+import os
+import re
+import select
+import sys
+from typing import Optional
+
+# Terminal escape sequences (arrow keys etc.) that should not leak into the prompt text
+_ESCAPE_RE = re.compile(r"\x1b(\[[0-9;?]*[ -/]*[@-~]|.)")
+
+_buffer = bytearray()
+_fd: Optional[int] = None
+_saved_attrs: Optional[list] = None
+
+
+def _read_available() -> None:
+    """Event-loop reader callback: move whatever stdin has into the buffer.
+
+    The fd stays in blocking mode (it shares its file description with stdout and
+    stderr on a tty); this is only called once stdin is known to be readable.
+    """
+    try:
+        data = os.read(_fd, 4096)
+    except (BlockingIOError, InterruptedError):
+        return
+    except OSError:
+        _stop()
+        return
+    _buffer.extend(data)
+
+
+def _stop() -> None:
+    """Stop capturing and restore the terminal settings."""
+    global _fd, _saved_attrs
+    if _fd is None:
+        return
+    import termios
+
+    try:
+        asyncio.get_running_loop().remove_reader(_fd)
+    except RuntimeError:
+        pass
+    if _saved_attrs is not None:
+        termios.tcsetattr(_fd, termios.TCSANOW, _saved_attrs)
+    _fd = None
+    _saved_attrs = None
+
+
+def _clean(text: str) -> str:
+    """Turn raw keystrokes into prompt text: apply backspaces, drop control keys."""
+    text = _ESCAPE_RE.sub("", text)
+    chars: list[str] = []
+    for ch in text:
+        if ch in "\r\n":
+            break
+        if ch in "\x7f\b":
+            if chars:
+                chars.pop()
+        elif ch.isprintable():
+            chars.append(ch)
+    return "".join(chars)
+
+
+def start_capturing_early_input() -> None:
+    """Buffer stdin until drain_early_input() is called.
+
+    Puts the terminal in cbreak mode so keys arrive without waiting for Enter and
+    reads them from the running event loop. Does nothing when stdin is not a TTY
+    or the platform has no termios (Windows).
+    """
+    global _fd, _saved_attrs
+    if _fd is not None or not sys.stdin.isatty():
+        return
+    try:
+        import termios
+        import tty
+    except ImportError:
+        return
+
+    fd = sys.stdin.fileno()
+    try:
+        _saved_attrs = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        _fd = fd
+        asyncio.get_running_loop().add_reader(fd, _read_available)
+    except (OSError, termios.error):
+        _fd = fd
+        _stop()
+        return
+    # Never leave the terminal in cbreak mode, even if startup is interrupted
+    atexit.register(_stop)
+
+
+def drain_early_input() -> str:
+    """Stop capturing and return the text typed so far (empty if nothing was captured)."""
+    if _fd is not None:
+        # Pick up keys the event loop has not delivered yet, without blocking
+        try:
+            if select.select([_fd], [], [], 0)[0]:
+                _read_available()
+        except (OSError, ValueError):
+            pass
+        _stop()
+    text = _clean(_buffer.decode("utf-8", errors="ignore"))
+    _buffer.clear()
+    return text
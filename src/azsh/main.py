@@ -6,7 +6,13 @@ from azsh.repl import run_repl
 
 
 def main():
-    asyncio.run(run_repl())
+    # uvloop (optional) speeds up subprocess and socket I/O; fall back to the stdlib loop
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_repl())
+    else:
+        uvloop.run(run_repl())
 
 
 if __name__ == "__main__":
@@ -1,32 +1,95 @@
 """Resolve @mentions in user input by querying Azure resources and prepending context."""
 
-import json
+import asyncio
 import os
 import re
 import subprocess
-from typing import Callable
+import time
+import urllib.parse
+from typing import Callable, Optional
 
 from rich.console import Console
 
+from azsh._proc import exec_capture, parse_json
+from azsh.arm import arm_get, arm_list, subscription_id
 from azsh.resource_cache import get_active_rg, get_cached_resources
 
 console = Console()
 
 AZ_TIMEOUT = 10
+RESOURCES_API_VERSION = "2021-04-01"
+ACCOUNT_TTL = 60
+RESOURCE_LIST_TTL = 15
+MAX_FILE_BYTES = 64 * 1024
 
+# (fetched_at, data) entries, keyed per resource group for resource lists
+_account_cache: Optional[tuple[float, dict]] = None
+_resource_list_cache: dict[str, tuple[float, list]] = {}
 
-def _run_az(args: list[str]) -> dict | list | str:
+
+async def _run_az(args: list[str]) -> dict | list | str:
     """Run an az CLI command and return parsed JSON output."""
     cmd = ["az"] + args + ["--output", "json"]
-    result = subprocess.run(
-        cmd, capture_output=True, text=True, timeout=AZ_TIMEOUT
-    )
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip() or f"az command failed: {' '.join(cmd)}")
-    return json.loads(result.stdout)
+    try:
+        returncode, stdout, stderr = await exec_capture(cmd, timeout=AZ_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise subprocess.TimeoutExpired(cmd, AZ_TIMEOUT)
+    if returncode != 0:
+        raise RuntimeError(stderr.decode().strip() or f"az command failed: {' '.join(cmd)}")
+    # `vm list -d` and friends can return megabytes; those are parsed off the event loop
+    return await parse_json(stdout)
+
+
+async def get_account() -> dict:
+    """Return `az account show` output, reusing a cached copy for ACCOUNT_TTL seconds."""
+    global _account_cache
+    if _account_cache and time.monotonic() - _account_cache[0] < ACCOUNT_TTL:
+        return _account_cache[1]
+    info = await _run_az(["account", "show"])
+    _account_cache = (time.monotonic(), info)
+    return info
+
+
+def clear_account_cache() -> None:
+    """Forget the cached account, e.g. after switching subscriptions."""
+    global _account_cache
+    _account_cache = None
+    _resource_list_cache.clear()
+
+
+async def _rg_path(rg_name: str) -> str:
+    """Return the ARM path of a resource group in the current subscription."""
+    sub_id = await subscription_id()
+    return f"/subscriptions/{sub_id}/resourceGroups/{urllib.parse.quote(rg_name)}"
+
+
+async def _list_resources(rg_name: str) -> list:
+    """Return the resources in an RG, cached per RG for RESOURCE_LIST_TTL seconds."""
+    key = rg_name.lower()
+    cached = _resource_list_cache.get(key)
+    if cached and time.monotonic() - cached[0] < RESOURCE_LIST_TTL:
+        return cached[1]
+    resources = await arm_list(f"{await _rg_path(rg_name)}/resources", RESOURCES_API_VERSION)
+    _resource_list_cache[key] = (time.monotonic(), resources)
+    return resources
+
 
+def _jmespath_literal(text: str) -> str:
+    """Escape text for a JMESPath raw string literal ('...'), e.g. a mention like @vm:web01's."""
+    return text.replace("\\", "\\\\").replace("'", "\\'")
 
-def _resolve_sub(match: re.Match) -> tuple[str, str]:
+
+async def _list_by_name(kind: str, names: set[str]) -> dict[str, dict]:
+    """Fetch every mentioned resource of one kind with a single az list call."""
+    query = " || ".join(f"name=='{_jmespath_literal(name)}'" for name in sorted(names))
+    items = await _run_az(_BATCH_LIST_ARGS[kind] + ["--query", f"[?{query}]"])
+    found: dict[str, dict] = {}
+    for item in items:
+        found.setdefault(item.get("name", ""), item)
+    return found
+
+
+async def _resolve_sub(match: re.Match) -> tuple[str, str]:
     """Resolve @sub — show current subscription context."""
     console.print("[dim]⟳ Resolving @sub...[/dim]")
     # Try Cloud Shell env vars first (instant)
@@ -44,7 +107,7 @@ def _resolve_sub(match: re.Match) -> tuple[str, str]:
         return context, "the current subscription"
     # Fallback to az CLI
     try:
-        info = _run_az(["account", "show"])
+        info = await get_account()
         name = info.get("name", "unknown")
         sub_id = info.get("id", "unknown")
         tenant = info.get("tenantId", "unknown")
@@ -59,25 +122,34 @@ def _resolve_sub(match: re.Match) -> tuple[str, str]:
         return f"[Could not resolve @sub: {e}]", "@sub"
 
 
-def _resolve_rg(match: re.Match) -> tuple[str, str]:
+async def _resolve_rg(match: re.Match) -> tuple[str, str]:
     """Resolve @rg:<name> — show resource group details and resources."""
-    name = match.group(1)
+    name = match.group("rg")
     console.print(f"[dim]⟳ Resolving @rg:{name}...[/dim]")
     try:
-        group = _run_az(["group", "show", "-n", name])
+        # A failed resource listing still leaves the group details worth reporting
+        group, resources = await asyncio.gather(
+            arm_get(await _rg_path(name), RESOURCES_API_VERSION),
+            _list_resources(name),
+            return_exceptions=True,
+        )
+        if isinstance(group, Exception):
+            raise group
         location = group.get("location", "unknown")
         tags = group.get("tags") or {}
         prov_state = group.get("properties", {}).get("provisioningState", "unknown")
         tags_str = ", ".join(f"{k}={v}" for k, v in tags.items()) if tags else "none"
 
-        resources = _run_az(["resource", "list", "-g", name])
-        resource_lines = []
-        for r in resources:
-            r_name = r.get("name", "?")
-            r_type = r.get("type", "?")
-            r_loc = r.get("location", "?")
-            resource_lines.append(f"  - {r_name} ({r_type}) [{r_loc}]")
-        resources_text = "\n".join(resource_lines) if resource_lines else "  (none)"
+        if isinstance(resources, Exception):
+            resources_text = f"  (could not list resources: {resources})"
+        else:
+            resource_lines = []
+            for r in resources:
+                r_name = r.get("name", "?")
+                r_type = r.get("type", "?")
+                r_loc = r.get("location", "?")
+                resource_lines.append(f"  - {r_name} ({r_type}) [{r_loc}]")
+            resources_text = "\n".join(resource_lines) if resource_lines else "  (none)"
 
         context = (
             f"[Azure Context: Resource Group '{name}']\n"
@@ -89,15 +161,14 @@ def _resolve_rg(match: re.Match) -> tuple[str, str]:
         return f"[Could not resolve @rg:{name}: {e}]", f"@rg:{name}"
 
 
-def _resolve_vm(match: re.Match) -> tuple[str, str]:
+async def _resolve_vm(match: re.Match, batch: asyncio.Future) -> tuple[str, str]:
     """Resolve @vm:<name> — show VM details."""
-    name = match.group(1)
+    name = match.group("vm")
     console.print(f"[dim]⟳ Resolving @vm:{name}...[/dim]")
     try:
-        vms = _run_az(["vm", "list", "-d", "--query", f"[?name=='{name}']"])
-        if not vms:
+        vm = (await batch).get(name)
+        if not vm:
             return f"[Could not resolve @vm:{name}: VM not found]", f"@vm:{name}"
-        vm = vms[0]
         size = vm.get("hardwareProfile", {}).get("vmSize", "unknown")
         power_state = vm.get("powerState", "unknown")
         os_type = vm.get("storageProfile", {}).get("osDisk", {}).get("osType", "unknown")
@@ -117,15 +188,14 @@ def _resolve_vm(match: re.Match) -> tuple[str, str]:
         return f"[Could not resolve @vm:{name}: {e}]", f"@vm:{name}"
 
 
-def _resolve_aks(match: re.Match) -> tuple[str, str]:
+async def _resolve_aks(match: re.Match, batch: asyncio.Future) -> tuple[str, str]:
     """Resolve @aks:<name> — show AKS cluster details."""
-    name = match.group(1)
+    name = match.group("aks")
     console.print(f"[dim]⟳ Resolving @aks:{name}...[/dim]")
     try:
-        clusters = _run_az(["aks", "list", "--query", f"[?name=='{name}']"])
-        if not clusters:
+        cluster = (await batch).get(name)
+        if not cluster:
             return f"[Could not resolve @aks:{name}: cluster not found]", f"@aks:{name}"
-        cluster = clusters[0]
         version = cluster.get("kubernetesVersion", "unknown")
         fqdn = cluster.get("fqdn", "unknown")
         prov_state = cluster.get("provisioningState", "unknown")
@@ -149,14 +219,25 @@ def _resolve_aks(match: re.Match) -> tuple[str, str]:
         return f"[Could not resolve @aks:{name}: {e}]", f"@aks:{name}"
 
 
-def _resolve_file(match: re.Match) -> tuple[str, str]:
+def _read_file(path: str) -> str:
+    """Read up to MAX_FILE_BYTES of a local file (run off the event loop)."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        data = f.read(MAX_FILE_BYTES)
+    # Binary reads skip text mode's universal newlines; normalise CRLF (and lone CR) here
+    contents = data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    if size > MAX_FILE_BYTES:
+        contents += f"\n[... truncated {size - MAX_FILE_BYTES} bytes ...]"
+    return contents
+
+
+async def _resolve_file(match: re.Match) -> tuple[str, str]:
     """Resolve @file:<path> — read a local file and include its contents."""
-    path = match.group(1)
+    path = match.group("file")
     expanded = os.path.expanduser(path)
     console.print(f"[dim]⟳ Resolving @file:{path}...[/dim]")
     try:
-        with open(expanded, "r") as f:
-            contents = f.read()
+        contents = await asyncio.to_thread(_read_file, expanded)
         context = (
             f"[Azure Context: File '{path}']\n"
             f"{contents}"
@@ -168,10 +249,10 @@ def _resolve_file(match: re.Match) -> tuple[str, str]:
         return f"[Could not resolve @file:{path}: {e}]", f"@file:{path}"
 
 
-def _resolve_dynamic_resource(match: re.Match) -> tuple[str, str]:
+async def _resolve_dynamic_resource(match: re.Match) -> tuple[str, str]:
     """Resolve @prefix:name by looking up the resource in the cache."""
-    prefix = match.group(1)
-    name = match.group(2)
+    prefix = match.group("prefix")
+    name = match.group("name")
     console.print(f"[dim]⟳ Resolving @{prefix}:{name}...[/dim]")
 
     resources = get_cached_resources()
@@ -207,38 +288,76 @@ def _resolve_dynamic_resource(match: re.Match) -> tuple[str, str]:
     return context, f"resource '{name}'"
 
 
-# Ordered list of (pattern, resolver). Checked in order against user input.
-MENTION_PATTERNS: list[tuple[str, Callable]] = [
-    (r"@sub\b", _resolve_sub),
-    (r"@rg:(\S+)", _resolve_rg),
-    (r"@vm:(\S+)", _resolve_vm),
-    (r"@aks:(\S+)", _resolve_aks),
-    (r"@file:(\S+)", _resolve_file),
-    (r"@(\w+):(\S+)", _resolve_dynamic_resource),
-]
+# Single scanner for every mention kind. Alternation order sets precedence, so the
+# generic @prefix:name branch only sees prefixes not claimed by an earlier branch.
+_MENTION_RE = re.compile(
+    r"(?P<sub>@sub\b)"
+    r"|@rg:(?P<rg>\S+)"
+    r"|@vm:(?P<vm>\S+)"
+    r"|@aks:(?P<aks>\S+)"
+    r"|@file:(?P<file>\S+)"
+    r"|@(?P<prefix>\w+):(?P<name>\S+)"
+)
+
+# Mention kinds looked up in one batched az list call per prompt
+_BATCH_LIST_ARGS: dict[str, list[str]] = {
+    "vm": ["vm", "list", "-d"],
+    "aks": ["aks", "list"],
+}
+
+# Resolver for each match, keyed by the match's lastgroup
+_RESOLVERS: dict[str, Callable] = {
+    "sub": _resolve_sub,
+    "rg": _resolve_rg,
+    "vm": _resolve_vm,
+    "aks": _resolve_aks,
+    "file": _resolve_file,
+    "name": _resolve_dynamic_resource,
+}
 
 
 async def resolve_mentions(user_input: str) -> str:
     """Resolve all @mentions in user input and return modified prompt with context prepended."""
-    contexts: list[str] = []
-    cleaned = user_input
-
-    for pattern, resolver in MENTION_PATTERNS:
-        for match in re.finditer(pattern, cleaned):
-            try:
-                context, replacement = resolver(match)
-            except subprocess.TimeoutExpired:
-                mention = match.group(0)
-                context = f"[Could not resolve {mention}: timed out after {AZ_TIMEOUT}s]"
-                replacement = mention
-            contexts.append(context)
-            cleaned = cleaned.replace(match.group(0), replacement, 1)
-
-    # Clean up extra whitespace from replacements
-    cleaned = re.sub(r"  +", " ", cleaned).strip()
-
-    if not contexts:
+    # Most prompts mention nothing; skip the regex scan entirely
+    if "@" not in user_input:
+        return user_input
+
+    matches = list(_MENTION_RE.finditer(user_input))
+    if not matches:
         return user_input
 
+    # One az call per batched kind, shared by every mention of that kind
+    names_by_kind: dict[str, set[str]] = {}
+    for match in matches:
+        if match.lastgroup in _BATCH_LIST_ARGS:
+            names_by_kind.setdefault(match.lastgroup, set()).add(match.group(match.lastgroup))
+    batches = {
+        kind: asyncio.ensure_future(_list_by_name(kind, names))
+        for kind, names in names_by_kind.items()
+    }
+
+    async def _resolve(match: re.Match) -> tuple[str, str]:
+        kind = match.lastgroup
+        try:
+            if kind in batches:
+                return await _RESOLVERS[kind](match, batches[kind])
+            return await _RESOLVERS[kind](match)
+        except subprocess.TimeoutExpired:
+            mention = match.group(0)
+            return f"[Could not resolve {mention}: timed out after {AZ_TIMEOUT}s]", mention
+
+    # Resolve every mention concurrently, then splice replacements in with one forward walk
+    results = await asyncio.gather(*(_resolve(match) for match in matches))
+    contexts: list[str] = []
+    pieces: list[str] = []
+    prev = 0
+    for match, (context, replacement) in zip(matches, results):
+        contexts.append(context)
+        pieces.append(user_input[prev:match.start()])
+        pieces.append(replacement)
+        prev = match.end()
+    pieces.append(user_input[prev:])
+    cleaned = "".join(pieces)
+
     preamble = "\n\n".join(contexts)
     return f"{preamble}\n\nUser question: {cleaned}"
@@ -1,92 +1,100 @@
 """Interactive REPL loop for azsh."""
 
 import asyncio
-import sys
+import io
+import time
 
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import Completer, Completion
-from prompt_toolkit.formatted_text import HTML
 from rich.console import Console
-from rich.markdown import Markdown
 
 from copilot.generated.session_events import SessionEventType
 
 from azsh.agent import cleanup, create_agent
+from azsh.arm import warm_up
 from azsh.commands import handle_command
+from azsh.early_input import drain_early_input, start_capturing_early_input
 from azsh.mentions import resolve_mentions
-from azsh.resource_cache import get_active_rg, get_resource_completions
+from azsh.resource_cache import get_active_rg
 
 console = Console()
 
-SLASH_COMMANDS = {
-    "/sub": "Show/switch Azure subscription",
-    "/rg": "Set working resource group",
-    "/help": "Show available commands and @ mentions",
-    "/clear": "Clear the screen",
-    "/exit": "Exit azsh",
-    "/quit": "Exit azsh",
-}
-
-STATIC_MENTIONS = {
-    "@sub": "Current subscription context",
-    "@file:": "File contents — @file:<path>",
-}
-
-
-class AzshCompleter(Completer):
-    """Autocomplete for slash commands and @ mentions."""
-
-    def get_completions(self, document, complete_event):
-        text = document.text_before_cursor
-
-        if text.startswith("/"):
-            for cmd, desc in SLASH_COMMANDS.items():
-                if cmd.startswith(text):
-                    yield Completion(cmd, start_position=-len(text), display_meta=desc)
-
-        # Complete @ mentions at any position
-        at_pos = text.rfind("@")
-        if at_pos >= 0:
-            at_text = text[at_pos:]
-
-            # Static mentions
-            for mention, desc in STATIC_MENTIONS.items():
-                if mention.startswith(at_text):
-                    yield Completion(
-                        mention,
-                        start_position=-len(at_text),
-                        display_meta=desc,
-                    )
-
-            # Dynamic resources from active RG
-            rg = get_active_rg()
-            if rg:
-                for mention, desc in get_resource_completions():
-                    if mention.startswith(at_text):
-                        yield Completion(
-                            mention,
-                            start_position=-len(at_text),
-                            display_meta=desc,
-                        )
+# Minimum seconds between markdown re-renders while a reply streams
+RENDER_INTERVAL = 0.1
+# Startup banner as a single markup string, printed with one console.print call
+_BANNER = (
+    "\n"
+    "[bold blue]  ╔═╗╔═══╗╔═══╗╦  ╦[/bold blue]\n"
+    "[bold blue]  ╠═╣  ╔═╝╚══╗║╠══╣[/bold blue]\n"
+    "[bold blue]  ╩ ╩╚═══╝╚═══╝╩  ╩[/bold blue]\n"
+    "\n"
+    "[bold white]  Azure Cloud Shell + AI[/bold white]  [dim]v0.1.0[/dim]\n"
+    "[dim]  Powered by GitHub Copilot SDK[/dim]\n"
+    "\n"
+    "[dim]Type /help for commands, @ to mention Azure resources[/dim]\n"
+)
 
 
 async def run_repl():
     """Run the interactive azsh REPL."""
+    # Keep keystrokes typed during startup for the first prompt
+    start_capturing_early_input()
+
+    # A reply streams into a Live region that is only started by the first rendered
+    # delta, and is stopped before anything else needs the terminal
+    response_buffer = io.StringIO()
+    live = None
+    last_render = 0.0
+    # Buffer length as of the last render, so an unchanged reply is not re-parsed
+    rendered_len = 0
+
+    def render():
+        nonlocal live, last_render, rendered_len
+        if live is None:
+            if not response_buffer.tell():
+                return
+            live = Live(console=console, refresh_per_second=10)
+            live.start()
+        live.update(Markdown(response_buffer.getvalue(), style="bright_white"))
+        last_render = time.monotonic()
+        rendered_len = response_buffer.tell()
+
+    def stop_live():
+        """Leave the streamed text on screen and hand the terminal back."""
+        nonlocal live
+        if live is None:
+            return
+        # Usually SESSION_IDLE has already rendered the complete reply
+        if response_buffer.tell() != rendered_len:
+            render()
+        live.stop()
+        live = None
+        # The text stays printed; anything streamed after this starts a new region
+        response_buffer.seek(0)
+        response_buffer.truncate()
+
+    # Start the Copilot client now and yield once so it begins booting while the banner prints.
+    # The agent's own questions use input(), which Live's refresh would draw over.
+    agent_task = asyncio.create_task(create_agent(before_user_input=stop_live))
+    # Pre-fetch the ARM token so the first @mention does not wait on az for it
+    # (the task is held in a local so it is not garbage-collected mid-flight)
+    warm_up_task = asyncio.create_task(warm_up())
+    await asyncio.sleep(0)
+
     # Banner using Rich for reliable rendering
-    console.print()
-    console.print("[bold blue]  ╔═╗╔═══╗╔═══╗╦  ╦[/bold blue]")
-    console.print("[bold blue]  ╠═╣  ╔═╝╚══╗║╠══╣[/bold blue]")
-    console.print("[bold blue]  ╩ ╩╚═══╝╚═══╝╩  ╩[/bold blue]")
-    console.print()
-    console.print("[bold white]  Azure Cloud Shell + AI[/bold white]  [dim]v0.1.0[/dim]")
-    console.print("[dim]  Powered by GitHub Copilot SDK[/dim]")
-    console.print()
+    console.print(_BANNER)
+
+    # prompt_toolkit and rich's markdown/live renderers are heavy imports; load them
+    # only now, while the agent boots, instead of before the agent could start
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import HTML
+    from rich.live import Live
+    from rich.markdown import Markdown
 
-    console.print("[dim]Type /help for commands, @ to mention Azure resources[/dim]\n")
+    from azsh.completer import AzshCompleter
 
     try:
-        client, session = await create_agent()
+        client, session = await agent_task
     except Exception as e:
+        drain_early_input()
         console.print(
             f"[bold red]Error:[/bold red] Failed to initialize Copilot agent: {e}"
         )
@@ -99,17 +107,29 @@ async def run_repl():
         completer=AzshCompleter(),
         complete_while_typing=True,
     )
+    early_input = drain_early_input()
 
     try:
-        response_buffer = []
+        # handle_event runs for every streamed token; bind what it touches to closure locals.
+        # Enum members are singletons, so event types are compared by identity.
+        delta_type = SessionEventType.ASSISTANT_MESSAGE_DELTA
+        idle_type = SessionEventType.SESSION_IDLE
+        write = response_buffer.write
+        monotonic = time.monotonic
 
         def handle_event(event):
-            if event.type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
-                delta = event.data.delta_content or ""
-                response_buffer.append(delta)
-                # Show a dot for progress while streaming
-                sys.stdout.write(".")
-                sys.stdout.flush()
+            event_type = event.type
+            if event_type is delta_type:
+                delta = event.data.delta_content
+                if not delta:
+                    return
+                write(delta)
+                # Markdown re-parses the whole reply and Live only repaints at 10 Hz anyway,
+                # so rebuild at most every RENDER_INTERVAL
+                if monotonic() - last_render >= RENDER_INTERVAL:
+                    render()
+            elif event_type is idle_type:
+                render()
 
         session.on(handle_event)
 
@@ -122,7 +142,8 @@ async def run_repl():
                     )
                 else:
                     prompt_text = HTML("<cyan><b>azsh&gt;</b></cyan> ")
-                user_input = (await prompt_session.prompt_async(prompt_text)).strip()
+                user_input = (await prompt_session.prompt_async(prompt_text, default=early_input)).strip()
+                early_input = ""
             except (KeyboardInterrupt, EOFError):
                 console.print("\n[dim]Goodbye![/dim]")
                 break
@@ -139,7 +160,7 @@ async def run_repl():
             if result == "handled":
                 continue
 
-            resolved_text = await resolve_mentions(user_input)
+            resolved_text = await resolve_mentions(user_input) if "@" in user_input else user_input
 
             # Prepend active resource group context if set
             active_rg = get_active_rg()
@@ -151,21 +172,20 @@ async def run_repl():
                 )
 
             console.print("[dim]⏳ Thinking...[/dim]")
-            response_buffer.clear()
+            response_buffer.seek(0)
+            response_buffer.truncate()
+            error = None
             try:
                 await session.send_and_wait({"prompt": resolved_text, "timeout": 300})
             except asyncio.TimeoutError:
-                console.print("\n[yellow]⚠ Response timed out.[/yellow]")
+                error = "\n[yellow]⚠ Response timed out.[/yellow]"
             except Exception as e:
-                console.print(f"\n[red]Error: {e}[/red]")
-
-            # Render the collected response as markdown
-            if response_buffer:
-                full_response = "".join(response_buffer)
-                sys.stdout.write("\r\033[K")
-                sys.stdout.flush()
-                console.print()
-                console.print(Markdown(full_response), style="bright_white")
+                error = f"\n[red]Error: {e}[/red]"
+            finally:
+                # Render any deltas that arrived since the last throttled update
+                stop_live()
+            if error:
+                console.print(error)
             print()
     except KeyboardInterrupt:
         console.print("\n[dim]Goodbye![/dim]")
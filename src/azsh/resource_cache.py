@@ -2,92 +2,179 @@
 
 import asyncio
 import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
 from typing import Optional
 
 from rich.console import Console
 
+from azsh._proc import exec_capture, parse_json
+from azsh.arm import default_subscription
+
 console = Console()
 
+# Resource lists are also kept on disk so re-selecting a recent RG skips az entirely
+DISK_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "azsh", "resources"
+)
+DISK_CACHE_TTL = 60
+
+
 # Active resource group and cached resources
-_active_rg: Optional[str] = None
-_cached_resources: list[dict] = []
-_fetch_task: Optional[asyncio.Task] = None
+@dataclass
+class _State:
+    active_rg: Optional[str] = None
+    resources: list[dict] = field(default_factory=list)
+    fetch_task: Optional[asyncio.Task] = None
+    # Completion entries for `resources`, rebuilt lazily after the RG or its resources change
+    completions: Optional[list[tuple[str, str]]] = None
+
+
+_state = _State()
 
 
 def get_active_rg() -> Optional[str]:
-    return _active_rg
+    return _state.active_rg
 
 
 def get_cached_resources() -> list[dict]:
-    return _cached_resources
+    return _state.resources
 
 
-async def _fetch_resources(rg_name: str) -> list[dict]:
-    """Fetch resources in a resource group via az CLI."""
+async def _fetch_resources(rg_name: str, sub_id: str) -> list[dict]:
+    """Fetch resources in a resource group via az CLI (in `sub_id`, if given)."""
+    cmd = ["az", "resource", "list", "-g", rg_name, "--output", "json"]
+    if sub_id:
+        cmd += ["--subscription", sub_id]
     try:
-        process = await asyncio.create_subprocess_shell(
-            f"az resource list -g {rg_name} --output json",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=15)
-        if process.returncode != 0:
+        returncode, stdout, _ = await exec_capture(cmd, timeout=15)
+        if returncode != 0:
             return []
-        return json.loads(stdout.decode())
-    except (asyncio.TimeoutError, json.JSONDecodeError):
+        # Parsing a big resource group can take a while; keep it off the event loop
+        return await parse_json(stdout)
+    except (OSError, asyncio.TimeoutError, json.JSONDecodeError):
         return []
 
 
+def _disk_cache_path(sub_id: str, rg_name: str) -> str:
+    """Return the on-disk cache file for an RG in a subscription."""
+    return os.path.join(DISK_CACHE_DIR, sub_id, f"{rg_name.lower()}.json")
+
+
+def _read_disk_cache(sub_id: str, rg_name: str) -> Optional[list[dict]]:
+    """Return the cached resource list if it was written within DISK_CACHE_TTL seconds."""
+    path = _disk_cache_path(sub_id, rg_name)
+    try:
+        if time.time() - os.path.getmtime(path) >= DISK_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_disk_cache(sub_id: str, rg_name: str, resources: list[dict]) -> None:
+    """Atomically replace the cached resource list for an RG."""
+    path = _disk_cache_path(sub_id, rg_name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(resources, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def _annotate(resources: list[dict]) -> list[dict]:
+    """Store each resource's @mention on it once, at load time."""
+    for r in resources:
+        # Shorten type: Microsoft.Compute/virtualMachines -> vm
+        short_type = _short_resource_type(r.get("type", ""))
+        name = r.get("name", "")
+        r["_mention"] = f"@{short_type}:{name}" if short_type else f"@{name}"
+    return resources
+
+
+async def _load_resources(rg_name: str) -> list[dict]:
+    """Return an RG's resources from the disk cache, or fetch and cache them."""
+    # Key the disk cache by az's current default subscription and pin the fetch to it,
+    # so the cached list always belongs to its key; if the default cannot be read,
+    # skip the disk cache rather than risk a mix-up
+    sub_id = await asyncio.to_thread(default_subscription)
+    if sub_id:
+        resources = await asyncio.to_thread(_read_disk_cache, sub_id, rg_name)
+        if resources is not None:
+            return _annotate(resources)
+    resources = await _fetch_resources(rg_name, sub_id)
+    if resources and sub_id:
+        await asyncio.to_thread(_write_disk_cache, sub_id, rg_name, resources)
+    return _annotate(resources)
+
+
 async def set_active_rg(rg_name: str) -> None:
     """Set the active resource group and prefetch its resources."""
-    global _active_rg, _cached_resources, _fetch_task
-
-    _active_rg = rg_name
-    _cached_resources = []
+    state = _state
+    state.active_rg = rg_name
+    state.resources = []
+    state.completions = None
 
     # Cancel any in-flight fetch
-    if _fetch_task and not _fetch_task.done():
-        _fetch_task.cancel()
+    if state.fetch_task and not state.fetch_task.done():
+        state.fetch_task.cancel()
 
     async def _do_fetch():
-        global _cached_resources
-        _cached_resources = await _fetch_resources(rg_name)
+        state.resources = await _load_resources(rg_name)
+        state.completions = None
 
-    _fetch_task = asyncio.create_task(_do_fetch())
+    state.fetch_task = asyncio.create_task(_do_fetch())
 
 
 def get_resource_completions() -> list[tuple[str, str]]:
-    """Return (mention, description) tuples for cached resources."""
-    completions = []
-    for r in _cached_resources:
-        name = r.get("name", "")
-        rtype = r.get("type", "")
-        location = r.get("location", "")
-        # Shorten type: Microsoft.Compute/virtualMachines -> vm
-        short_type = _short_resource_type(rtype)
-        mention = f"@{short_type}:{name}" if short_type else f"@{name}"
-        desc = f"{rtype} ({location})"
-        completions.append((mention, desc))
+    """Return (mention, description) tuples for cached resources, sorted by mention."""
+    state = _state
+    if state.completions is not None:
+        return state.completions
+    completions = sorted(
+        (r["_mention"], f"{r.get('type', '')} ({r.get('location', '')})")
+        for r in state.resources
+    )
+    state.completions = completions
     return completions
 
 
+# Azure resource types (lowercased) -> short @mention prefixes
+_SHORT_TYPES = {
+    "microsoft.compute/virtualmachines": "vm",
+    "microsoft.containerservice/managedclusters": "aks",
+    "microsoft.storage/storageaccounts": "storage",
+    "microsoft.web/sites": "webapp",
+    "microsoft.sql/servers": "sql",
+    "microsoft.network/virtualnetworks": "vnet",
+    "microsoft.network/networksecuritygroups": "nsg",
+    "microsoft.network/publicipaddresses": "pip",
+    "microsoft.network/loadbalancers": "lb",
+    "microsoft.keyvault/vaults": "kv",
+    "microsoft.containerregistry/registries": "acr",
+    "microsoft.dbforpostgresql/flexibleservers": "pg",
+    "microsoft.dbformysql/flexibleservers": "mysql",
+    "microsoft.insights/components": "appinsights",
+    "microsoft.operationalinsights/workspaces": "loganalytics",
+}
+# Results keyed by the type string exactly as az returns it, so each distinct
+# spelling is lowercased once rather than once per resource
+_short_type_memo: dict[str, str] = {}
+
+
 def _short_resource_type(full_type: str) -> str:
     """Map Azure resource types to short prefixes."""
-    mapping = {
-        "microsoft.compute/virtualmachines": "vm",
-        "microsoft.containerservice/managedclusters": "aks",
-        "microsoft.storage/storageaccounts": "storage",
-        "microsoft.web/sites": "webapp",
-        "microsoft.sql/servers": "sql",
-        "microsoft.network/virtualnetworks": "vnet",
-        "microsoft.network/networksecuritygroups": "nsg",
-        "microsoft.network/publicipaddresses": "pip",
-        "microsoft.network/loadbalancers": "lb",
-        "microsoft.keyvault/vaults": "kv",
-        "microsoft.containerregistry/registries": "acr",
-        "microsoft.dbforpostgresql/flexibleservers": "pg",
-        "microsoft.dbformysql/flexibleservers": "mysql",
-        "microsoft.insights/components": "appinsights",
-        "microsoft.operationalinsights/workspaces": "loganalytics",
-    }
-    return mapping.get(full_type.lower(), "")
+    short = _short_type_memo.get(full_type)
+    if short is None:
+        short = _short_type_memo[full_type] = _SHORT_TYPES.get(full_type.lower(), "")
+    return short
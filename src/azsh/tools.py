@@ -1,14 +1,84 @@
 """Custom tools for the Azure Shell CLI agent."""
 
 import asyncio
+import collections
 import json
 import os
+import shlex
+import time
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
 from copilot.tools import define_tool
 
+from azsh._proc import exec_capture, kill_process, parse_json, stop_process
+
+
+# Only the tail of a command's output is returned to the model
+MAX_STDOUT_BYTES = 256 * 1024
+MAX_STDERR_BYTES = 64 * 1024
+_READ_CHUNK = 64 * 1024
+
+# Formatted `az account show` context, reused for AZURE_CONTEXT_TTL seconds
+AZURE_CONTEXT_TTL = 300
+_ctx_cache: Optional[tuple[float, str]] = None
+
+# Characters that need /bin/sh to interpret; commands without any are exec'd directly
+_SHELL_META = frozenset("|&;<>()$`\\\"'*?[]{}#~=%!\n")
+
+
+async def _spawn(command: str, cwd: Optional[str]) -> asyncio.subprocess.Process:
+    """Start a command, skipping the intermediate shell when it uses no shell syntax."""
+    if _SHELL_META.isdisjoint(command):
+        argv = shlex.split(command)
+        if argv:
+            try:
+                return await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
+                )
+            except OSError:
+                # Shell builtins (cd, export, ...) and missing binaries: let the shell handle them
+                pass
+    return await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+
+
+async def _read_tail(stream: asyncio.StreamReader, max_bytes: int) -> tuple[bytes, int]:
+    """Read a stream to EOF keeping only its last `max_bytes`; returns (tail, bytes_dropped)."""
+    chunks: collections.deque[bytes] = collections.deque()
+    size = 0
+    dropped = 0
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        # Drop whole chunks from the front while the rest still covers max_bytes
+        while size - len(chunks[0]) >= max_bytes:
+            old = chunks.popleft()
+            size -= len(old)
+            dropped += len(old)
+    data = b"".join(chunks)
+    if len(data) > max_bytes:
+        dropped += len(data) - max_bytes
+        data = data[-max_bytes:]
+    return data, dropped
+
+
+def _format_stream(label: bytes, data: bytes, dropped: int) -> bytes:
+    if dropped:
+        return b"%s:\n[... %d earlier bytes truncated ...]\n%s" % (label, dropped, data)
+    return b"%s:\n%s" % (label, data)
+
 
 class RunCommandParams(BaseModel):
     command: str = Field(description="The shell command to execute")
@@ -28,24 +98,39 @@ class GetAzureContextParams(BaseModel):
     )
 )
 async def run_command(params: RunCommandParams) -> str:
+    cwd = params.working_directory
+    if cwd and not os.path.isdir(cwd):
+        return f"Error: Working directory does not exist: {cwd}"
+    try:
+        process = await _spawn(params.command, cwd)
+    except OSError as e:
+        return f"Error: Could not start command: {e}"
     try:
-        process = await asyncio.create_subprocess_shell(
-            params.command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=params.working_directory,
+        # Drain both pipes as output arrives so memory stays bounded for huge outputs
+        (stdout, stdout_dropped), (stderr, stderr_dropped), _ = await asyncio.wait_for(
+            asyncio.gather(
+                _read_tail(process.stdout, MAX_STDOUT_BYTES),
+                _read_tail(process.stderr, MAX_STDERR_BYTES),
+                process.wait(),
+            ),
+            timeout=60,
         )
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
     except asyncio.TimeoutError:
-        process.kill()
+        await stop_process(process)
         return "Error: Command timed out after 60 seconds."
-
-    result_parts = [f"Exit code: {process.returncode}"]
+    except BaseException:
+        # Cancelled (e.g. Ctrl-C): don't leave the command running
+        kill_process(process)
+        raise
+
+    # Assemble the result as bytes and decode once, rather than decoding each stream
+    # and copying the text again in the final join
+    result_parts = [b"Exit code: %d" % process.returncode]
     if stdout:
-        result_parts.append(f"Stdout:\n{stdout.decode()}")
+        result_parts.append(_format_stream(b"Stdout", stdout, stdout_dropped))
     if stderr:
-        result_parts.append(f"Stderr:\n{stderr.decode()}")
-    return "\n".join(result_parts)
+        result_parts.append(_format_stream(b"Stderr", stderr, stderr_dropped))
+    return b"\n".join(result_parts).decode(errors="replace")
 
 
 @define_tool(
@@ -55,6 +140,7 @@ async def run_command(params: RunCommandParams) -> str:
     )
 )
 async def get_azure_context(params: GetAzureContextParams) -> str:
+    global _ctx_cache
     # Try Cloud Shell env vars first (instant, no subprocess)
     sub_id = os.environ.get("ACC_USER_SUBSCRIPTION")
     if sub_id:
@@ -73,19 +159,20 @@ async def get_azure_context(params: GetAzureContextParams) -> str:
             f"Cloud: Azure (PROD)"
         )
 
+    if _ctx_cache and time.monotonic() - _ctx_cache[0] < AZURE_CONTEXT_TTL:
+        return _ctx_cache[1]
+
     # Fallback to az CLI
     try:
-        process = await asyncio.create_subprocess_shell(
-            "az account show --output json",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await exec_capture(
+            ["az", "account", "show", "--output", "json"], timeout=60
         )
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
     except asyncio.TimeoutError:
-        process.kill()
         return "Error: Timed out retrieving Azure context."
+    except OSError as e:
+        returncode, stdout, stderr = 127, b"", str(e).encode()
 
-    if process.returncode != 0:
+    if returncode != 0:
         error_msg = stderr.decode().strip() if stderr else "Unknown error"
         return (
             f"Error: Failed to get Azure context. {error_msg}\n"
@@ -94,12 +181,12 @@ async def get_azure_context(params: GetAzureContextParams) -> str:
         )
 
     try:
-        account = json.loads(stdout.decode())
+        account = await parse_json(stdout)
     except json.JSONDecodeError:
         return "Error: Could not parse Azure CLI output."
 
     user = account.get("user", {})
-    return (
+    context = (
         f"Subscription: {account.get('name', 'N/A')}\n"
         f"Subscription ID: {account.get('id', 'N/A')}\n"
         f"Tenant ID: {account.get('tenantId', 'N/A')}\n"
@@ -107,6 +194,14 @@ async def get_azure_context(params: GetAzureContextParams) -> str:
         f"Cloud: {account.get('cloudName', 'N/A')}\n"
         f"State: {account.get('state', 'N/A')}"
     )
+    _ctx_cache = (time.monotonic(), context)
+    return context
+
+
+def invalidate_azure_context_cache() -> None:
+    """Forget the cached Azure context, e.g. after switching subscriptions."""
+    global _ctx_cache
+    _ctx_cache = None
 
 
 all_tools = [run_command, get_azure_context]